@@ -1,20 +1,39 @@
 import fastapi.exceptions
-from fastapi.responses import FileResponse
-from fastapi import FastAPI, Depends
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi import FastAPI, Depends, Request
+from pydantic import BaseModel, validator
 
 import mosaic_random
 import painters
 from graph import Graph, PolyGraph, ScatterGraph
 from canvas import ICanvas, MosaicCanvas
+from render_pool import RenderPool
+from batch_render import SharedCache, imap_unordered, zip_stream
 
+import logging
 import random
+from contextlib import nullcontext
 from pathlib import Path
 import os
-from typing import Callable, Optional
+from typing import Callable, Iterator, Optional
+from urllib.parse import urlsplit
 
 
 MAX_PIXEL_COUNT = 3840*2160
 
+DEFAULT_WIDTH = 1920
+DEFAULT_HEIGHT = 1080
+DEFAULT_COUNT = 100
+
+# Number of pre-rendered default wallpapers (`GET /` without parameters) to keep ready; 0 disables the pool
+POOL_SIZE = int(os.environ.get('POOL_SIZE', 0))
+
+MAX_BATCH_SIZE = 64
+# Number of wallpapers rendered at the same time by `POST /batch`
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 4))
+
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Triangulate Wallpaper")
 
@@ -40,32 +59,101 @@ def get_noisy_painter(noise: int = 20, gauss: int = None) -> Callable[[painters.
     return lambda base: base
 
 
-def get_canvas(base=Depends(get_base), noisy_paint_getter=Depends(get_noisy_painter),
-               width: int = 1920, height: int = 1080, count: int = 100, seed: int = None) -> ICanvas:
-    if seed is not None:
-        mosaic_random.set_seed(seed)
+TEMPLATE_URL_SCHEMES = ('http', 'https')
+
+
+def is_template_url(url: str) -> bool:
+    return urlsplit(url).scheme in TEMPLATE_URL_SCHEMES
+
+
+def get_painter(base: str, width: int, height: int,
+                template_loader: Callable[[str], painters.TrianglePainter] = None) -> painters.TrianglePainter:
+    if base.startswith('#'):
+        return painters.ColorPainter(base)
+    if not is_template_url(base):
+        raise fastapi.exceptions.HTTPException(status_code=fastapi.status.HTTP_400_BAD_REQUEST,
+                                               detail="Only http(s) template urls are supported")
+    if template_loader is not None:
+        return template_loader(base)
+    return painters.UrlTemplatePainter(width, height, base)
+
+
+def check_size(width: int, height: int) -> None:
     if width * height > MAX_PIXEL_COUNT:
         raise fastapi.exceptions.HTTPException(status_code=fastapi.status.HTTP_400_BAD_REQUEST,
                                                detail="Too many pixels! Try a smaller size (maximum of 4k resolution)")
 
-    if base.startswith('#'):
-        painter = painters.ColorPainter(base)
-    else:
-        painter = painters.UrlTemplatePainter(width, height, base)
-    painter = noisy_paint_getter(painter)
 
+def make_graph(width: int, height: int, count: int) -> Graph:
+    graph = ScatterGraph(width, height, count=count, margin=200)
+    graph.triangulate()
+
+    return graph
+
+
+def render_canvas(painter: painters.TrianglePainter, width: int, height: int, count: int,
+                  graph: Graph = None) -> ICanvas:
     canvas = MosaicCanvas(painter, width=width, height=height)
 
-    graph = ScatterGraph(canvas.width, canvas.height, count=count, margin=200)
-    graph.triangulate()
+    if graph is None:
+        graph = make_graph(canvas.width, canvas.height, count)
 
     canvas.draw_graph(graph, ['colors'])
 
     return canvas
 
 
+def get_renderer(base=Depends(get_base), noisy_paint_getter=Depends(get_noisy_painter),
+                 width: int = DEFAULT_WIDTH, height: int = DEFAULT_HEIGHT, count: int = DEFAULT_COUNT,
+                 seed: int = None) -> Callable[[], ICanvas]:
+    check_size(width, height)
+
+    painter = noisy_paint_getter(get_painter(base, width, height))
+
+    def render() -> ICanvas:
+        if seed is None:
+            return render_canvas(painter, width, height, count)
+
+        # Seeded renders get their own generator, so they don't depend on what else has drawn from the global one
+        with mosaic_random.seeded(seed):
+            return render_canvas(painter, width, height, count)
+
+    return render
+
+
+def render_default() -> bytes:
+    painter = get_noisy_painter()(painters.ColorPainter(get_base()))
+
+    # Runs on the pool's thread; keep it off the global generator that live requests draw from
+    with mosaic_random.seeded(mosaic_random.random_seed()):
+        return render_canvas(painter, DEFAULT_WIDTH, DEFAULT_HEIGHT, DEFAULT_COUNT).to_png()
+
+
+pool = RenderPool(render_default, POOL_SIZE) if POOL_SIZE > 0 else None
+
+
+@app.on_event("startup")
+def start_pool():
+    if pool is not None:
+        pool.start()
+
+
+@app.on_event("shutdown")
+def stop_pool():
+    if pool is not None:
+        pool.stop()
+
+
 @app.get("/", response_class=FileResponse)
-def wallpaper(canvas=Depends(get_canvas)):
+def wallpaper(request: Request, render=Depends(get_renderer)):
+    if pool is not None and not request.query_params:
+        png = pool.get()
+        if png is not None:
+            return Response(content=png, media_type='image/png')
+
+    with pool.busy() if pool is not None else nullcontext():
+        canvas = render()
+
     store_dir = os.environ.get('IMAGE_STORE', '/tmp')
     store_path = Path(store_dir)
     path = store_path / 'triangles.png'
@@ -73,3 +161,114 @@ def wallpaper(canvas=Depends(get_canvas)):
     canvas.save_to(str(path))
 
     return path
+
+
+@app.get("/metrics")
+def metrics() -> dict:
+    return {
+        'pool': pool.metrics if pool is not None else None,
+    }
+
+
+class RenderSpec(BaseModel):
+    url: Optional[str] = None
+    color: Optional[str] = None
+    noise: Optional[int] = 20
+    gauss: Optional[int] = None
+    width: int = DEFAULT_WIDTH
+    height: int = DEFAULT_HEIGHT
+    count: int = DEFAULT_COUNT
+    seed: Optional[int] = None
+
+    @validator('url')
+    def check_url_scheme(cls, url: Optional[str]) -> Optional[str]:
+        if url is not None and not is_template_url(url):
+            raise ValueError("Only http(s) template urls are supported")
+        return url
+
+    def template_key(self) -> Optional[tuple]:
+        if self.url is None:
+            return None
+        return self.url, self.width, self.height
+
+    def graph_key(self) -> Optional[tuple]:
+        # Unseeded specs are meant to differ, so only seeded geometry is shared
+        if self.seed is None:
+            return None
+        return self.width, self.height, self.count, self.seed
+
+
+def load_template(url: str, width: int, height: int) -> painters.TemplatePainter:
+    painter = painters.UrlTemplatePainter(width, height, url)
+    # Fetch now, so concurrent renders sharing the painter don't each fetch it
+    _ = painter.fp
+
+    return painter
+
+
+def seeded_graph(spec: RenderSpec) -> (Graph, tuple):
+    graph = make_graph(spec.width, spec.height, spec.count)
+
+    # Later draws (noise) continue from here, so reusing the graph reproduces a standalone render exactly
+    return graph, mosaic_random.get_random().getstate()
+
+
+def render_spec(spec: RenderSpec, templates: SharedCache, graphs: SharedCache) -> bytes:
+    def template_loader(url: str) -> painters.TrianglePainter:
+        return templates.get(spec.template_key(), lambda: load_template(url, spec.width, spec.height))
+
+    painter = get_painter(get_base(spec.url, spec.color), spec.width, spec.height, template_loader)
+    painter = get_noisy_painter(spec.noise, spec.gauss)(painter)
+
+    seed = spec.seed if spec.seed is not None else mosaic_random.random_seed()
+    with mosaic_random.seeded(seed) as rng:
+        if spec.graph_key() is None:
+            graph = make_graph(spec.width, spec.height, spec.count)
+        else:
+            graph, state = graphs.get(spec.graph_key(), lambda: seeded_graph(spec))
+            rng.setstate(state)
+
+        canvas = render_canvas(painter, spec.width, spec.height, spec.count, graph=graph)
+
+    return canvas.to_png()
+
+
+@app.post("/batch", response_class=StreamingResponse)
+def batch(specs: list[RenderSpec]):
+    if len(specs) > MAX_BATCH_SIZE:
+        raise fastapi.exceptions.HTTPException(status_code=fastapi.status.HTTP_400_BAD_REQUEST,
+                                               detail=f"Too many wallpapers! "
+                                                      f"Try a smaller batch (maximum of {MAX_BATCH_SIZE})")
+    for spec in specs:
+        check_size(spec.width, spec.height)
+
+    templates = SharedCache(spec.template_key() for spec in specs if spec.template_key() is not None)
+    graphs = SharedCache(spec.graph_key() for spec in specs if spec.graph_key() is not None)
+
+    def render(item: (int, RenderSpec)) -> (str, bytes):
+        idx, spec = item
+        name = f'{idx:03d}_{spec.width}x{spec.height}'
+        try:
+            return f'{name}.png', render_spec(spec, templates, graphs)
+        except Exception:
+            # The response is already streaming, so report the failure in the archive instead.
+            # Keep the details server-side; they can reveal local files and internal hosts.
+            logger.exception("Failed to render batch item %d", idx)
+            return f'{name}.error.txt', b'render failed'
+
+    # Render specs sharing a template or geometry back to back, so shared entries are released soon after their
+    # first use; file names keep the original index
+    def schedule_key(item: (int, RenderSpec)) -> (tuple, tuple):
+        _, spec = item
+        return spec.template_key() or (), spec.graph_key() or ()
+
+    scheduled = sorted(enumerate(specs), key=schedule_key)
+
+    def stream() -> Iterator[bytes]:
+        # Batch renders are live work too, so pause the pool producer until the archive is done
+        with pool.busy() if pool is not None else nullcontext():
+            files = imap_unordered(render, scheduled, BATCH_WORKERS)
+            yield from zip_stream(files)
+
+    return StreamingResponse(stream(), media_type='application/zip',
+                             headers={'Content-Disposition': 'attachment; filename="wallpapers.zip"'})
@@ -0,0 +1,103 @@
+import threading
+import zipfile
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+
+class SharedCache:
+    """
+    Cache for values shared between the items of one batch.
+
+    Only keys expected more than once are kept, and each entry is dropped after its last expected use.
+    An entry lives from its first to its last use, so schedule items with the same key next to each other;
+    otherwise every key in the batch may be held at once.
+    """
+    _remaining: Counter
+    _items: dict
+    _key_locks: dict
+    _lock: threading.Lock
+
+    def __init__(self, keys: Iterable[Hashable]):
+        self._remaining = Counter(keys)
+        self._items = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Concurrent requests for the same key wait for the first one instead of computing it again
+        with key_lock:
+            with self._lock:
+                found = key in self._items
+                entry = self._items.get(key)
+
+            try:
+                if not found:
+                    # Failures are shared too, so the other users of the key fail fast instead of retrying
+                    try:
+                        entry = factory(), None
+                    except Exception as e:
+                        entry = None, e
+            finally:
+                with self._lock:
+                    self._remaining[key] -= 1
+                    if self._remaining[key] > 0:
+                        self._items[key] = entry
+                    else:
+                        self._items.pop(key, None)
+                        self._key_locks.pop(key, None)
+
+        value, error = entry
+        if error is not None:
+            raise error
+
+        return value
+
+
+def imap_unordered(fn: Callable, items: Iterable, workers: int) -> Iterator:
+    """Yield fn(item) for each item in completion order, with at most `workers` items in flight."""
+    items = iter(items)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(fn, item) for _, item in zip(range(workers), items)}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for item in items:
+                    pending.add(executor.submit(fn, item))
+                    break
+                yield future.result()
+
+
+class _StreamBuffer:
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_stream(files: Iterable[tuple[str, bytes]]) -> Iterator[bytes]:
+    """Yield a ZIP archive of (name, data) pairs, one chunk per file as soon as it is available."""
+    buf = _StreamBuffer()
+
+    # Images are already compressed, so store them as-is
+    with zipfile.ZipFile(buf, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for name, data in files:
+            zf.writestr(name, data)
+            yield buf.drain()
+
+    yield buf.drain()
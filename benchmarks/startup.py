@@ -0,0 +1,76 @@
+"""
+Measure interpreter startup and import cost for each entry point.
+
+Usage: python benchmarks/startup.py [--repeat N]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from os import path as os_path
+
+
+ROOT = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+
+ENTRY_POINTS = ['cli', 'api']
+
+# Modules that should only be imported on the code paths that need them
+HEAVY_MODULES = ['numpy', 'scipy', 'PIL', 'urllib.request']
+
+
+def import_time(module: str) -> (int, list[str]):
+    """Return the cumulative import time of `module` (in us) and the heavy modules it pulled in."""
+    check = f"import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}; {check}'],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+
+    cumulative = 0
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumul, name = line.split('|')
+        if name.strip() == module:
+            cumulative = int(cumul)
+
+    heavy = [m for m in proc.stdout.strip().split(',') if m]
+
+    return cumulative, heavy
+
+
+def wall_time(args: list[str], repeat: int) -> float:
+    """Return the median wall time (in ms) of running a fresh interpreter with `args`."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='Number of runs to take the median wall time over')
+    args = parser.parse_args()
+
+    baseline = wall_time(['-c', 'pass'], args.repeat)
+    print(f"{'interpreter':<16} {baseline:8.1f} ms")
+
+    for module in ENTRY_POINTS:
+        try:
+            cumulative, heavy = import_time(module)
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<16} failed to import: {e.stderr.strip().splitlines()[-1]}")
+            continue
+
+        print(f"{'import ' + module:<16} {cumulative / 1000:8.1f} ms  heavy: {', '.join(heavy) or '-'}")
+
+    help_time = wall_time(['cli.py', '--help'], args.repeat)
+    print(f"{'cli.py --help':<16} {help_time:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,14 @@
+from __future__ import annotations
+
+from io import BytesIO
+from typing import TYPE_CHECKING
+
 from graph import Point, Edge, Graph
 from .interface import ICanvas
 from painters import TrianglePainter
 
-from PIL import Image, ImageDraw
+if TYPE_CHECKING:
+    from PIL import Image, ImageDraw
 
 
 POINT_SIZE = 2
@@ -23,6 +29,8 @@ class ImageDrawMosaicCanvas(ICanvas):
         self._height = height
         self._triangle_painter = painter
 
+        from PIL import Image, ImageDraw
+
         self._image = Image.new('RGB', self._size())
         self._draw = ImageDraw.Draw(self._image)
 
@@ -84,3 +92,8 @@ class ImageDrawMosaicCanvas(ICanvas):
     def save_to(self, path: str):
         with open(path, 'wb') as fp:
             self._image.save(fp, "png")
+
+    def to_png(self) -> bytes:
+        buf = BytesIO()
+        self._image.save(buf, "png")
+        return buf.getvalue()
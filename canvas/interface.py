@@ -18,3 +18,6 @@ class ICanvas:
 
     def save_to(self, path: str):
         raise NotImplementedError
+
+    def to_png(self) -> bytes:
+        raise NotImplementedError
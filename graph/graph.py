@@ -1,7 +1,3 @@
-import numpy as np
-import scipy.spatial as ss
-
-
 from .point import Point
 from .edge import Edge
 
@@ -43,6 +39,10 @@ class Graph:
             self.add_edge(p, q)
 
     def triangulate(self):
+        # Imported here so that importing the package stays cheap (see benchmarks/startup.py)
+        import numpy as np
+        import scipy.spatial as ss
+
         # Points -> np array
         points = np.array([[p.x, p.y] for p in self._points])
 
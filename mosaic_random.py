@@ -1,10 +1,15 @@
 import random
 import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator
 
 
 seed = None
 random_obj = None
 
+_local = threading.local()
+
 
 def set_seed(val) -> None:
     global seed
@@ -28,7 +33,22 @@ def get_seed() -> int:
 def get_random() -> random.Random:
     global random_obj
 
+    local_obj = getattr(_local, 'random_obj', None)
+    if local_obj is not None:
+        return local_obj
+
     if random_obj is None:
         random_obj = random.Random(get_seed())
 
     return random_obj
+
+
+@contextmanager
+def seeded(val: int) -> Iterator[random.Random]:
+    """Use a generator seeded with `val` for the current thread only, e.g. for concurrent renders."""
+    prev = getattr(_local, 'random_obj', None)
+    _local.random_obj = random.Random(val)
+    try:
+        yield _local.random_obj
+    finally:
+        _local.random_obj = prev
@@ -1,4 +1,6 @@
-from PIL import Image
+import mmap
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
 
 from ..template_painter import TemplatePainter
 
@@ -11,5 +13,18 @@ class LocalTemplatePainter(TemplatePainter):
 
         self._path = path
 
-    def _get_new_image(self) -> Image:
-        return Image.open(self._path)
+    @contextmanager
+    def _open_source(self) -> Iterator[BinaryIO]:
+        with open(self._path, 'rb') as fp:
+            try:
+                src = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty files and special files (pipes, etc.) cannot be mapped
+                src = None
+
+            if src is None:
+                yield fp
+                return
+
+            with src:
+                yield src
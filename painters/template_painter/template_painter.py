@@ -1,9 +1,22 @@
-from PIL import Image
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, BinaryIO, Iterator
 
 from graph import Point
 
 from painters import TrianglePainter
 
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+# Modes Pillow can resample directly; anything else is converted to RGB before resizing
+RESAMPLE_MODES = {'RGB', 'L', 'CMYK', 'YCbCr'}
+
+# Let Pillow reduce() by an integer factor before resampling (see Image.resize)
+REDUCING_GAP = 3.0
+
 
 class TemplatePainter(TrianglePainter):
     _img: Image
@@ -19,13 +32,35 @@ class TemplatePainter(TrianglePainter):
     def fp(self) -> Image:
         if self._img is None:
             self._img = self._get_new_image()
-            self._img = self._img.convert("RGB")
-            self._img = self._img.resize((self._img_width, self._img_height))
         return self._img
 
-    def _get_new_image(self) -> Image:
+    @contextmanager
+    def _open_source(self) -> Iterator[BinaryIO]:
         raise NotImplementedError
 
+    def _get_new_image(self) -> Image:
+        from PIL import Image
+
+        size = self._img_width, self._img_height
+
+        with self._open_source() as src:
+            img = Image.open(src)
+
+            # JPEG (and some other decoders) can scale down by 1/2, 1/4, 1/8 while decoding.
+            # The draft size is never smaller than the requested size, so quality is kept.
+            img.draft('RGB', size)
+
+            if img.mode not in RESAMPLE_MODES:
+                img = img.convert('RGB')
+
+            # Decodes the source; must happen while it is still open
+            img = img.resize(size, reducing_gap=REDUCING_GAP)
+
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        return img
+
     def _get_pixel(self, x, y) -> (int, int, int):
         return self.fp.getpixel((x, y))
 
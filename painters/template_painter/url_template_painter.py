@@ -1,5 +1,5 @@
-from PIL import Image
-from urllib.request import urlopen
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
 
 from ..template_painter import TemplatePainter
 
@@ -11,6 +11,9 @@ class UrlTemplatePainter(TemplatePainter):
         super().__init__(width, height)
         self._url = url
 
-    def _get_new_image(self) -> Image:
-        fp = urlopen(self._url)
-        return Image.open(fp)
+    @contextmanager
+    def _open_source(self) -> Iterator[BinaryIO]:
+        from urllib.request import urlopen
+
+        with urlopen(self._url) as fp:
+            yield fp
@@ -0,0 +1,128 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class RenderPool:
+    """
+    Bounded pool of pre-rendered images, filled by a background thread.
+
+    The producer only starts a new render while no live render is in progress (see `busy`).
+    The pause applies between renders: a render that is already running is finished, so a live render
+    that starts meanwhile shares the CPU with it for up to one render.
+    """
+    _produce: Callable[[], bytes]
+    _queue: queue.Queue
+    _active: int
+    _idle: threading.Condition
+    _stopped: threading.Event
+    _thread: Optional[threading.Thread]
+    _stats_lock: threading.Lock
+    _hits: int
+    _misses: int
+
+    def __init__(self, produce: Callable[[], bytes], size: int):
+        self._produce = produce
+        self._queue = queue.Queue(maxsize=size)
+        self._active = 0
+        self._idle = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._queue.maxsize
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+        requests = hits + misses
+
+        return {
+            'depth': self.depth,
+            'capacity': self.capacity,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / requests if requests else 0.0,
+        }
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='render-pool', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        with self._idle:
+            self._idle.notify_all()
+        self._thread.join()
+        self._thread = None
+
+    def get(self) -> Optional[bytes]:
+        """Take a pre-rendered image, or return None if the pool is empty."""
+        try:
+            item = self._queue.get_nowait()
+        except queue.Empty:
+            with self._stats_lock:
+                self._misses += 1
+            return None
+
+        with self._stats_lock:
+            self._hits += 1
+        return item
+
+    @contextmanager
+    def busy(self) -> Iterator[None]:
+        """Keep the producer from starting new renders while a live render is running."""
+        with self._idle:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._idle:
+                self._active -= 1
+                self._idle.notify_all()
+
+    def _wait_until_idle(self) -> None:
+        with self._idle:
+            self._idle.wait_for(lambda: self._active == 0 or self._stopped.is_set())
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wait_until_idle()
+            if self._stopped.is_set():
+                break
+
+            try:
+                item = self._produce()
+            except Exception:
+                logger.exception("Failed to pre-render image")
+                self._stopped.wait(1)
+                continue
+
+            # Block while the pool is full, but wake up periodically to notice stop()
+            while not self._stopped.is_set():
+                try:
+                    self._queue.put(item, timeout=1)
+                    break
+                except queue.Full:
+                    continue